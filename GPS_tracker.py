@@ -1,7 +1,7 @@
 """
 gps_tracker.py
 Simple GPS tracking module using NMEA (serial).
-Dependencies: pyserial, pynmea2
+Dependencies: pyserial, pynmea2, numpy (optional: numba)
 
 Basic usage:
 from gps_tracker import GPSTracker
@@ -16,12 +16,23 @@ tracker.set_callback(cb)
 later
 
 tracker.stop()
+
+or, without a reading thread, from your own event loop:
+
+sel = selectors.DefaultSelector()
+tracker.register(sel)
+for key, _ in sel.select():
+    key.data()  # tracker.poll()
 """
 
+import calendar
+import select
+import selectors
 import threading
 import time
-import csv
-from collections import deque
+import datetime
+import functools
+import math
 from typing import Callable, Optional, Dict, Any, Tuple, List
 
 try:
@@ -34,10 +45,29 @@ try:
 except Exception as e:
     raise ImportError("pynmea2 not found. Install with: pip install pynmea2") from e
 
+try:
+    import numpy as np
+except Exception as e:
+    raise ImportError("numpy not found. Install with: pip install numpy") from e
+
+try:
+    from numba import njit, prange  # optional: JIT-compiled haversine
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+try:
+    import _nmea_fast  # optional: compiled reader, build with `cythonize -i _nmea_fast.pyx`
+    HAVE_NMEA_FAST = True
+except ImportError:
+    HAVE_NMEA_FAST = False
+
 
 class Position:
     """Simple class to store GPS position."""
 
+    __slots__ = ('lat', 'lon', 'alt', 'timestamp')  # no per-instance __dict__
+
     def __init__(self, lat: float, lon: float, alt: Optional[float], timestamp: Optional[float]):
         self.lat = lat
         self.lon = lon
@@ -51,13 +81,58 @@ class Position:
         return f"Position(lat={self.lat:.6f}, lon={self.lon:.6f}, alt={self.alt}, time={self.timestamp})"
 
 
+class CircleGeofence:
+    """
+    Circular geofence with its trig precomputed, for fences checked over and over.
+    center=(lat, lon), radius in meters.
+    """
+
+    __slots__ = ('lat', 'lon', 'radius_m', 'phi2', 'lon2', 'cos_phi2', 'a_max', 'dlat_max', 'dlon_max')
+
+    def __init__(self, lat: float, lon: float, radius_m: float):
+        self.lat = lat
+        self.lon = lon
+        self.radius_m = radius_m
+        self.phi2 = math.radians(lat)
+        self.lon2 = math.radians(lon)
+        self.cos_phi2 = math.cos(self.phi2)
+        # haversine term for a distance of radius_m: d <= r  <=>  a <= sin^2(r / 2R)
+        self.a_max = math.sin(min(radius_m / (2 * 6371000.0), math.pi / 2)) ** 2
+        # bounding box of the spherical cap, in degrees (lon unbounded if the cap reaches a pole)
+        ang = radius_m / 6371000.0
+        self.dlat_max = math.degrees(ang)
+        sin_ang = math.sin(min(ang, math.pi / 2))
+        self.dlon_max = (math.degrees(math.asin(sin_ang / self.cos_phi2))
+                         if sin_ang < self.cos_phi2 else 180.0)
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """True if (lat, lon) is inside the fence (no sqrt/atan2, center trig cached)."""
+        # cheap rejection first: most checks of a moving receiver land outside the box
+        if abs(lat - self.lat) > self.dlat_max:
+            return False
+        if abs((lon - self.lon + 180.0) % 360.0 - 180.0) > self.dlon_max:
+            return False
+        phi1 = math.radians(lat)
+        a = (math.sin((self.phi2 - phi1) / 2.0) ** 2
+             + math.cos(phi1) * self.cos_phi2 * math.sin((self.lon2 - math.radians(lon)) / 2.0) ** 2)
+        return a <= self.a_max
+
+    def __repr__(self):
+        return f"CircleGeofence(lat={self.lat:.6f}, lon={self.lon:.6f}, radius_m={self.radius_m})"
+
+
 class GPSTracker:
     """
     GPSTracker: reads NMEA sentences from a serial port and provides:
-    - start()/stop()
-    - callback when a new valid position is obtained
-    - get_last(), get_history()
-    - simple geofence detection (circle)
+    - start()/stop() (reading thread), or poll()/register() for an event loop
+    - callback when a new valid position is obtained, or batched callbacks (arrays)
+    - get_last(), get_history(), get_history_arrays()
+    - simple geofence detection (one or several circles, or registered CircleGeofence objects)
+
+    No locks: the reading thread is the single producer of positions, any
+    other thread only reads. The last position is published by rebinding one
+    attribute (atomic in CPython), and the history ring is only read below
+    its write index, which is bumped after a slot is fully written.
     """
 
     def __init__(
@@ -74,14 +149,49 @@ class GPSTracker:
         self._thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
         self._callback: Optional[Callable[[Position], None]] = None
-        self._history: deque = deque(maxlen=history_size)
-        self._lock = threading.Lock()
+        # history ring buffer, one float64 array per field (NaN = missing alt/timestamp)
+        # one spare slot so the writer never touches the history_size slots readers may copy
+        self._history_size = history_size
+        self._hist_cap = history_size + 1
+        self._hist_lat = np.empty(self._hist_cap, dtype=np.float64)
+        self._hist_lon = np.empty(self._hist_cap, dtype=np.float64)
+        self._hist_alt = np.empty(self._hist_cap, dtype=np.float64)
+        self._hist_ts = np.empty(self._hist_cap, dtype=np.float64)
+        self._hist_idx = 0  # total number of fixes written (slot = idx % _hist_cap)
         self._last_position: Optional[Position] = None
+        self._buf = bytearray()  # raw bytes not yet terminated by a newline
+        self._fast_reader = None  # _nmea_fast.NMEAReader on the open port, if built
+        # batched delivery (set_batch_callback): fixes from _batch_start on are pending
+        self._batch_callback: Optional[Callable[..., None]] = None
+        self._batch_interval = 0.1
+        self._batch_start = 0
+        self._batch_deadline = 0.0
+        self._geofences: List[CircleGeofence] = []
+        # pynmea2 fallback: sentence type -> handler(msg) returning Position or None
+        self._handlers: Dict[str, Callable[[Any], Optional[Position]]] = {
+            'GGA': self._handle_gga,
+            'RMC': self._handle_rmc,
+        }
 
     def set_callback(self, cb: Callable[[Position], None]):
         """Registers callback(pos: Position) called for each new valid position."""
         self._callback = cb
 
+    def set_batch_callback(
+        self,
+        cb: Optional[Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], None]],
+        interval_ms: float = 100
+    ):
+        """
+        Registers cb(lats, lons, alts, timestamps) called at most every interval_ms with
+        the fixes received since the previous call, as arrays (NaN = missing alt/timestamp).
+        Fixes older than history_size at flush time are skipped. None disables it.
+        """
+        self._batch_interval = interval_ms / 1000.0
+        self._batch_start = self._hist_idx
+        self._batch_deadline = time.monotonic() + self._batch_interval
+        self._batch_callback = cb
+
     def start(self):
         """Opens the serial port and starts the reading thread."""
         if self._thread and self._thread.is_alive():
@@ -105,6 +215,9 @@ class GPSTracker:
         if self._ser and self._ser.is_open:
             return
         self._ser = serial.Serial(self.serial_port, baudrate=self.baudrate, timeout=self.timeout)
+        self._fast_reader = None
+        if HAVE_NMEA_FAST:
+            self._fast_reader = _nmea_fast.NMEAReader(self._ser.fileno(), self._on_fast_fix)
 
     def _read_loop(self):
         try:
@@ -115,74 +228,211 @@ class GPSTracker:
 
         while not self._stop_event.is_set():
             try:
-                line = self._ser.readline()
-                if not line:
-                    continue
-                try:
-                    # pyserial returns bytes; decode ignoring errors
-                    line_str = line.decode(errors="ignore").strip()
-                except Exception:
-                    continue
-                if not line_str:
-                    continue
-
-                # parse NMEA sentence
-                try:
-                    msg = pynmea2.parse(line_str)
-                except pynmea2.nmea.ChecksumError:
-                    continue  # invalid checksum
-                except pynmea2.ParseError:
-                    continue  # unknown sentence
-
-                pos = None
-                timestamp = None
-
-                # Messages with fix: GGA (GPS Fix Data), RMC (Recommended Minimum)
-                if isinstance(msg, pynmea2.types.talker.GGA):
-                    if msg.lat and msg.lon:
-                        lat = _nmea_to_decimal(msg.lat, msg.lat_dir)
-                        lon = _nmea_to_decimal(msg.lon, msg.lon_dir)
-                        alt = float(msg.alt) if msg.alt not in (None, '') else None
-                        timestamp = _nmea_time_to_epoch(msg.timestamp)
-                        pos = Position(lat, lon, alt, timestamp)
-                elif isinstance(msg, pynmea2.types.talker.RMC):
-                    if msg.lat and msg.lon and msg.status == 'A':  # 'A' = active (valid)
-                        lat = _nmea_to_decimal(msg.lat, msg.lat_dir)
-                        lon = _nmea_to_decimal(msg.lon, msg.lon_dir)
-                        alt = None
-                        timestamp = _nmea_datetime_to_epoch(msg.datestamp, msg.timestamp)
-                        pos = Position(lat, lon, alt, timestamp)
-
-                if pos:
-                    with self._lock:
-                        self._last_position = pos
-                        self._history.append(pos)
-                    if self._callback:
-                        try:
-                            self._callback(pos)
-                        except Exception as cb_e:
-                            print(f"[GPSTracker] callback error: {cb_e}")
-
+                self.poll(block=True)
             except Exception as e:
                 print(f"[GPSTracker] read loop error: {e}")
                 time.sleep(0.5)
 
+    def poll(self, block: bool = False):
+        """
+        Reads whatever the serial port has buffered and processes complete sentences
+        (callback, history, last position). Opens the port if needed.
+        Non-blocking by default, for use from an application event loop;
+        block=True waits for at least one byte, bounded by the serial timeout.
+        Use either poll() or start(), not both: there must be a single reader.
+        """
+        self._read_available(block)
+        if self._batch_callback is not None:
+            self._flush_batch()
+
+    def _read_available(self, block: bool):
+        self._open_serial()
+        if self._fast_reader is not None:
+            # compiled path: reads the (non-blocking) fd itself and parses without the GIL;
+            # only once readable, so an empty read means the device is gone (it raises)
+            fd = self._ser.fileno()
+            if select.select([fd], [], [], self.timeout if block else 0)[0]:
+                self._fast_reader.read()
+            return
+        n = self._ser.in_waiting
+        if not n:
+            if not block:
+                return
+            n = 1
+        chunk = self._ser.read(n)
+        if not chunk:
+            return
+        self._buf.extend(chunk)
+        while True:
+            nl = self._buf.find(b'\n')
+            if nl < 0:
+                break
+            line = bytes(self._buf[:nl])
+            del self._buf[:nl + 1]
+            self._handle_line(line)
+        if len(self._buf) > 4096:
+            del self._buf[:]  # no newline in sight: noise, not NMEA (max 82 chars/line)
+
+    def _flush_batch(self):
+        """Delivers the pending fixes to the batch callback once its interval elapsed."""
+        now = time.monotonic()
+        if now < self._batch_deadline:
+            return
+        self._batch_deadline = now + self._batch_interval
+        end = self._hist_idx
+        start = max(self._batch_start, end - self._history_size)
+        if start == end:
+            return
+        self._batch_start = end
+        # copies: the ring slots are reused as new fixes arrive
+        slots = np.arange(start, end) % self._hist_cap
+        try:
+            self._batch_callback(self._hist_lat[slots], self._hist_lon[slots],
+                                 self._hist_alt[slots], self._hist_ts[slots])
+        except Exception as cb_e:
+            print(f"[GPSTracker] batch callback error: {cb_e}")
+
+    def register(self, selector: selectors.BaseSelector):
+        """
+        Opens the serial port and registers it on selector for EVENT_READ,
+        with self.poll as the key data:
+
+            for key, _ in sel.select():
+                key.data()
+        """
+        self._open_serial()
+        selector.register(self._ser.fileno(), selectors.EVENT_READ, self.poll)
+
+    def unregister(self, selector: selectors.BaseSelector):
+        """Removes the serial port from selector (call before stop())."""
+        selector.unregister(self._ser.fileno())
+
+    def _handle_line(self, line: bytes):
+        """Parses one raw NMEA line and publishes the position, if any."""
+        line = line.strip()
+        # sentence type sits right after "$" + 2-char talker: b"$GPGGA,..."[3:6] == b"GGA"
+        parser = _FAST_PARSERS.get(line[3:6])
+        if parser is None or line[6:7] != b',':
+            return  # only GGA/RMC carry a fix: GSV/GSA/VTG/... never get decoded
+        if not _nmea_checksum_ok(line):
+            return  # invalid checksum: garbled line, drop it before decoding/parsing
+        # NMEA is plain ASCII
+        line_str = line.decode('ascii', 'ignore')
+
+        star = line_str.rfind('*')
+        fields = (line_str[:star] if star != -1 else line_str).split(',')
+
+        try:
+            pos = parser(fields)
+        except (ValueError, KeyError, IndexError):
+            # malformed for the fast parser (short sentence, odd field layout...)
+            pos = self._parse_with_pynmea2(line_str)
+
+        if pos:
+            self._publish(pos)
+
+    def _on_fast_fix(self, lat: float, lon: float, alt: float, sod: float, ddmmyy: int):
+        """Callback of the compiled reader (NaN alt / negative sod / ddmmyy = missing)."""
+        nmea_time = nmea_date = None
+        if sod >= 0:
+            whole = int(sod)
+            nmea_time = datetime.time(whole // 3600, whole // 60 % 60, whole % 60,
+                                      min(int(round((sod - whole) * 1e6)), 999999))
+        day, month, yy = ddmmyy // 10000, ddmmyy // 100 % 100, ddmmyy % 100
+        year = 2000 + yy if yy < 69 else 1900 + yy  # same pivot as _parse_nmea_date
+        if ddmmyy >= 0 and 1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]:
+            nmea_date = datetime.date(year, month, day)
+        # same conversion as the Python path; GGA or an invalid RMC date (e.g. 000000)
+        # leaves nmea_date None, i.e. today's date
+        timestamp = _nmea_datetime_to_epoch(nmea_date, nmea_time)
+        self._publish(Position(lat, lon, None if alt != alt else alt, timestamp))
+
+    def _publish(self, pos: Position):
+        """Stores pos in history and as last position, then runs the callback."""
+        self._history_append(pos)
+        self._last_position = pos
+        if self._callback:
+            try:
+                self._callback(pos)
+            except Exception as cb_e:
+                print(f"[GPSTracker] callback error: {cb_e}")
+
+    def _parse_with_pynmea2(self, line_str: str) -> Optional[Position]:
+        """Fallback parser for sentences the fast field-split parser could not handle."""
+        # only reached for GGA/RMC lines whose checksum _handle_line() already validated
+        try:
+            msg = pynmea2.parse(line_str, check=False)
+        except pynmea2.ParseError:
+            return None  # rare: line too mangled for pynmea2's sentence regex
+
+        handler = self._handlers.get(getattr(msg, 'sentence_type', None))
+        if handler is None:
+            return None
+        try:
+            return handler(msg)
+        except (ValueError, KeyError):
+            return None  # bad coordinate or hemisphere
+
+    # Messages with fix: GGA (GPS Fix Data), RMC (Recommended Minimum)
+    def _handle_gga(self, msg) -> Optional[Position]:
+        if not (msg.lat and msg.lon):
+            return None
+        lat = _nmea_to_decimal(msg.lat, msg.lat_dir)
+        lon = _nmea_to_decimal(msg.lon, msg.lon_dir)
+        # pynmea2 returns the raw string when it cannot convert the field
+        alt = msg.altitude if isinstance(msg.altitude, float) else None
+        timestamp = _nmea_time_to_epoch(_as_type(msg.timestamp, datetime.time))
+        return Position(lat, lon, alt, timestamp)
+
+    def _handle_rmc(self, msg) -> Optional[Position]:
+        if not (msg.lat and msg.lon and msg.status == 'A'):  # 'A' = active (valid)
+            return None
+        lat = _nmea_to_decimal(msg.lat, msg.lat_dir)
+        lon = _nmea_to_decimal(msg.lon, msg.lon_dir)
+        timestamp = _nmea_datetime_to_epoch(_as_type(msg.datestamp, datetime.date),
+                                            _as_type(msg.timestamp, datetime.time))
+        return Position(lat, lon, None, timestamp)
+
     def get_last(self) -> Optional[Position]:
-        with self._lock:
-            return self._last_position
+        return self._last_position
+
+    def _history_append(self, pos: Position):
+        """Writes pos into the next ring slot, then publishes it (reader thread only)."""
+        i = self._hist_idx % self._hist_cap
+        self._hist_lat[i] = pos.lat
+        self._hist_lon[i] = pos.lon
+        self._hist_alt[i] = np.nan if pos.alt is None else pos.alt
+        self._hist_ts[i] = np.nan if pos.timestamp is None else pos.timestamp
+        self._hist_idx += 1
+
+    def get_history_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns copies of the history as (lat, lon, alt, timestamp) arrays, oldest first.
+        Missing alt/timestamp values are NaN.
+        """
+        n = self._history_size
+        end = self._hist_idx  # snapshot: every fix below it is fully written
+        start = max(0, end - n)
+        slots = np.arange(start, end) % self._hist_cap
+        out = tuple(a[slots] for a in (self._hist_lat, self._hist_lon, self._hist_alt, self._hist_ts))
+        # if the writer advanced while we copied, it may have reused the oldest slots: drop them
+        lapped = max(0, self._hist_idx - n - start)
+        return tuple(a[lapped:] for a in out)
 
     def get_history(self) -> List[Position]:
-        with self._lock:
-            return list(self._history)
+        lats, lons, alts, tss = self.get_history_arrays()
+        return [
+            Position(lat, lon, None if alt != alt else alt, None if ts != ts else ts)  # NaN -> None
+            for lat, lon, alt, ts in zip(lats.tolist(), lons.tolist(), alts.tolist(), tss.tolist())
+        ]
 
     def save_history_csv(self, path: str):
         """Saves position history to a CSV file (lat, lon, alt, timestamp)."""
-        data = self.get_history()
+        data = np.column_stack(self.get_history_arrays())
+        # format the whole file with one % operation and write it in one go
+        body = (_CSV_ROW_FMT * len(data)) % tuple(data.ravel().tolist())
         with open(path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["lat", "lon", "alt", "timestamp"])
-            for p in data:
-                writer.writerow([p.lat, p.lon, p.alt, p.timestamp])
+            f.write("lat,lon,alt,timestamp\n" + body)
 
     def geofence_check_circle(self, center: Tuple[float, float], radius_m: float) -> Optional[bool]:
         """
@@ -193,50 +443,183 @@ class GPSTracker:
         last = self.get_last()
         if last is None:
             return None
-        d = haversine_distance_m((last.lat, last.lon), center)
-        return d <= radius_m
+        # flat-earth (cheap ruler) distance: accurate for fence-sized distances, no trig per call
+        kx, ky = _cheap_ruler_factors(center[0])
+        dy = (last.lat - center[0]) * ky
+        if abs(dy) > radius_m:
+            return False  # outside the bounding box
+        dx = ((last.lon - center[1] + 180.0) % 360.0 - 180.0) * kx
+        if abs(dx) > radius_m:
+            return False
+        return dx * dx + dy * dy <= radius_m * radius_m
+
+    def geofence_check_circles(
+        self, fences: List[Tuple[Tuple[float, float], float]]
+    ) -> Optional[List[bool]]:
+        """
+        Checks the last position against several circular geofences at once.
+        fences=[((lat, lon), radius_m), ...]
+        Returns one bool per fence (True = inside), or None (no position).
+        """
+        last = self.get_last()
+        if last is None:
+            return None
+        if not fences:
+            return []
+        centers = np.asarray([c for c, _ in fences], dtype=np.float64)
+        radii = np.asarray([r for _, r in fences], dtype=np.float64)
+        d = haversine_distance_m_batch(centers[:, 0], centers[:, 1], (last.lat, last.lon))
+        return (d <= radii).tolist()
+
+    def add_geofence(self, fence: CircleGeofence):
+        """Registers a geofence evaluated by check_geofences()."""
+        self._geofences.append(fence)
+
+    def check_geofences(self) -> Optional[List[bool]]:
+        """
+        Checks the last position against the registered geofences.
+        Returns one bool per fence, in registration order (True = inside), or None (no position).
+        """
+        last = self.get_last()
+        if last is None:
+            return None
+        return [f.contains(last.lat, last.lon) for f in self._geofences]
 
 
 # --- Utility functions below ---
 
+# One history row in save_history_csv(): lat/lon ~0.1 m, alt cm, timestamp ms
+_CSV_ROW_FMT = "%.6f,%.6f,%.2f,%.3f\n"
+
+# Field positions in a comma-split sentence (index 0 is the address, e.g. "$GPGGA").
+_GGA_IDX = {'time': 1, 'lat': 2, 'lat_dir': 3, 'lon': 4, 'lon_dir': 5, 'fix': 6, 'alt': 9}
+_RMC_IDX = {'time': 1, 'status': 2, 'lat': 3, 'lat_dir': 4, 'lon': 5, 'lon_dir': 6, 'date': 9}
+
+# Valid characters of the two-digit NMEA checksum
+_HEX_DIGITS = b'0123456789abcdefABCDEF'
+
+
+def _nmea_checksum_ok(line: bytes) -> bool:
+    """
+    Validates the XOR checksum of a raw sentence like b"$GPGGA,...*47".
+    Sentences without checksum are accepted (same as pynmea2 default).
+    """
+    star = line.rfind(b'*')
+    if star == -1:
+        return True
+    x = 0
+    for b in line[1:star]:
+        x ^= b
+    # exactly two hex digits (like _nmea_fast): int() would also take '4', '+4' or ' 4'
+    cks = line[star + 1:star + 3]
+    if len(cks) != 2 or not all(c in _HEX_DIGITS for c in cks):
+        return False
+    return x == int(cks, 16)
+
+
+def _parse_nmea_time(time_str: str) -> Optional[datetime.time]:
+    """Parses NMEA hhmmss(.sss) into datetime.time. Returns None if empty."""
+    if not time_str:
+        return None
+    # digits and an optional '.fraction' only (like _nmea_fast): float() would also
+    # take '123519inf' or '123519.5e400', whose int() raises OverflowError
+    frac = time_str[7:]
+    if not time_str[:6].isdigit() or (len(time_str) > 6 and (time_str[6] != '.'
+                                                            or (frac and not frac.isdigit()))):
+        raise ValueError(f"malformed NMEA time: {time_str!r}")
+    micro = int(round(float(time_str[6:]) * 1e6)) if len(time_str) > 7 else 0
+    return datetime.time(int(time_str[0:2]), int(time_str[2:4]), int(time_str[4:6]), min(micro, 999999))
+
+
+def _parse_nmea_date(date_str: str) -> Optional[datetime.date]:
+    """Parses NMEA ddmmyy into datetime.date. Returns None if empty."""
+    if not date_str:
+        return None
+    yy = int(date_str[4:6])
+    year = 2000 + yy if yy < 69 else 1900 + yy  # same pivot as strptime('%y')
+    return datetime.date(year, int(date_str[2:4]), int(date_str[0:2]))
+
+
+def _parse_gga_fields(fields: List[str]) -> Optional[Position]:
+    """Builds a Position from the fields of a GGA sentence (None if no fix)."""
+    i = _GGA_IDX
+    if not (fields[i['lat']] and fields[i['lon']]):
+        return None
+    lat = _nmea_to_decimal(fields[i['lat']], fields[i['lat_dir']])
+    lon = _nmea_to_decimal(fields[i['lon']], fields[i['lon_dir']])
+    alt = float(fields[i['alt']]) if fields[i['alt']] else None
+    timestamp = _nmea_time_to_epoch(_parse_nmea_time(fields[i['time']]))
+    return Position(lat, lon, alt, timestamp)
+
+
+def _parse_rmc_fields(fields: List[str]) -> Optional[Position]:
+    """Builds a Position from the fields of a RMC sentence (None if not active)."""
+    i = _RMC_IDX
+    if not (fields[i['lat']] and fields[i['lon']] and fields[i['status']] == 'A'):  # 'A' = active (valid)
+        return None
+    lat = _nmea_to_decimal(fields[i['lat']], fields[i['lat_dir']])
+    lon = _nmea_to_decimal(fields[i['lon']], fields[i['lon_dir']])
+    timestamp = _nmea_datetime_to_epoch(_parse_nmea_date(fields[i['date']]),
+                                        _parse_nmea_time(fields[i['time']]))
+    return Position(lat, lon, None, timestamp)
+
+
+# Raw sentence type (bytes 3-5 of the line) -> fast parser
+_FAST_PARSERS = {b'GGA': _parse_gga_fields, b'RMC': _parse_rmc_fields}
+
+
+# Hemisphere -> sign of the decimal coordinate
+_SIGN = {'N': 1.0, 'E': 1.0, 'S': -1.0, 'W': -1.0}
+
+
 def _nmea_to_decimal(coord_str: str, direction: str) -> float:
     """
     Converts NMEA coordinate (ddmm.mmmm or dddmm.mmmm) to decimal degrees.
     coord_str: string like "4916.45" (49 deg 16.45')
-    direction: 'N', 'S', 'E', or 'W'
+    direction: 'N', 'S', 'E', or 'W' (anything else raises KeyError)
     """
     if not coord_str:
         raise ValueError("coord_str is empty")
-    dot_pos = coord_str.find('.')
-    if dot_pos == -1:
-        deg_len = 2 if len(coord_str) <= 4 else len(coord_str) - 4
-    else:
-        deg_len = 2 if dot_pos <= 4 else dot_pos - 2
+    # minutes always take the last 2 digits before the dot; parse as ints
+    head, _, tail = coord_str.partition('.')
+    deg_digits = len(head) - 2
+    degrees = int(head[:deg_digits])
+    minutes = int(head[deg_digits:])
+    if tail:
+        minutes += int(tail) / 10 ** len(tail)
+    return _SIGN[direction] * (degrees + minutes / 60.0)
+
+
+def _as_type(value, cls):
+    """value if it is a cls instance, else None (pynmea2 leaves unconvertible fields as str)."""
+    return value if isinstance(value, cls) else None
+
 
-    degrees = float(coord_str[:deg_len])
-    minutes = float(coord_str[deg_len:])
-    dec = degrees + minutes / 60.0
-    if direction in ('S', 'W'):
-        dec = -dec
-    return dec
+# Local midnight of the current day as epoch, valid while start <= time.time() < end
+_midnight_cache = {'start': 0.0, 'end': 0.0}
+
+
+def _today_midnight_epoch() -> float:
+    """Returns today's local midnight as epoch seconds, recomputed only when the day changes."""
+    now = time.time()
+    cache = _midnight_cache
+    if not (cache['start'] <= now < cache['end']):
+        lt = time.localtime(now)
+        cache['start'] = time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday, 0, 0, 0, 0, 0, -1))
+        cache['end'] = time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+    return cache['start']
 
 
 def _nmea_time_to_epoch(nmea_time) -> Optional[float]:
     """
-    Converts NMEA time (hh:mm:ss) to epoch seconds assuming today's date.
+    Converts NMEA time (hh:mm:ss[.ffffff]) to epoch seconds assuming today's date.
     Returns None if nmea_time is None.
     """
     if nmea_time is None:
         return None
-    try:
-        t = nmea_time
-        now = time.localtime()
-        epoch = time.mktime((now.tm_year, now.tm_mon, now.tm_mday,
-                             t.hour, t.minute, t.second,
-                             now.tm_wday, now.tm_yday, now.tm_isdst))
-        return epoch
-    except Exception:
-        return None
+    t = nmea_time
+    return (_today_midnight_epoch() + t.hour * 3600 + t.minute * 60 + t.second
+            + t.microsecond * 1e-6)
 
 
 def _nmea_datetime_to_epoch(datestamp, timestamp) -> Optional[float]:
@@ -245,22 +628,28 @@ def _nmea_datetime_to_epoch(datestamp, timestamp) -> Optional[float]:
     """
     if datestamp is None or timestamp is None:
         return _nmea_time_to_epoch(timestamp)
-    try:
-        dt = datestamp
-        t = timestamp
-        epoch = time.mktime((dt.year, dt.month, dt.day, t.hour, t.minute, t.second, 0, 0, -1))
-        return epoch
-    except Exception:
-        return None
+    dt = datestamp
+    t = timestamp
+    return (time.mktime((dt.year, dt.month, dt.day, t.hour, t.minute, t.second, 0, 0, -1))
+            + t.microsecond * 1e-6)
 
 
-def haversine_distance_m(p1: Tuple[float, float], p2: Tuple[float, float]) -> float:
+@functools.lru_cache(maxsize=256)
+def _cheap_ruler_factors(lat: float) -> Tuple[float, float]:
     """
-    Haversine distance between two (lat, lon) points in meters.
+    Returns (kx, ky): meters per degree of longitude/latitude around lat.
+    Cached per exact latitude (fence centers don't move, so hits are the norm).
     """
-    import math
-    lat1, lon1 = p1
-    lat2, lon2 = p2
+    # WGS84 factors, as in mapbox cheap-ruler
+    e2 = (1 / 298.257223563) * (2 - 1 / 298.257223563)
+    m = math.radians(1.0) * 6378137.0
+    cos_lat = math.cos(math.radians(lat))
+    w2 = 1 / (1 - e2 * (1 - cos_lat * cos_lat))
+    w = math.sqrt(w2)
+    return m * w * cos_lat, m * w * w2 * (1 - e2)
+
+
+def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     R = 6371000.0  # Earth's mean radius in meters
     phi1 = math.radians(lat1)
     phi2 = math.radians(lat2)
@@ -271,6 +660,46 @@ def haversine_distance_m(p1: Tuple[float, float], p2: Tuple[float, float]) -> fl
     return R * c
 
 
+if HAVE_NUMBA:
+    # same code, compiled (math.* calls are lowered to LLVM intrinsics)
+    _haversine_fast = njit(fastmath=True, cache=True)(_haversine)
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _haversine_batch(lats, lons, c_lat, c_lon, out):
+        for i in prange(lats.size):
+            out[i] = _haversine_fast(lats[i], lons[i], c_lat, c_lon)
+else:
+    _haversine_fast = _haversine
+
+
+def haversine_distance_m(p1: Tuple[float, float], p2: Tuple[float, float]) -> float:
+    """
+    Haversine distance between two (lat, lon) points in meters.
+    """
+    return _haversine_fast(p1[0], p1[1], p2[0], p2[1])
+
+
+def haversine_distance_m_batch(lats, lons, center: Tuple[float, float]) -> np.ndarray:
+    """
+    Vectorized haversine: distance in meters from each (lats[i], lons[i]) to center=(lat, lon).
+    lats/lons: array-likes of the same length (e.g. from GPSTracker.get_history_arrays()).
+    Runs as a parallel Numba loop when numba is installed, NumPy otherwise.
+    """
+    lats = np.ascontiguousarray(lats, dtype=np.float64)
+    lons = np.ascontiguousarray(lons, dtype=np.float64)
+    if HAVE_NUMBA:
+        out = np.empty_like(lats)
+        _haversine_batch(lats, lons, float(center[0]), float(center[1]), out)
+        return out
+    R = 6371000.0  # Earth's mean radius in meters
+    phi1 = np.radians(lats)
+    phi2 = np.radians(center[0])
+    dphi = phi2 - phi1
+    dlambda = np.radians(center[1] - lons)
+    a = np.sin(dphi / 2.0) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2.0) ** 2
+    return 2 * R * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
 # Demo (not for production)
 if __name__ == "__main__":
     import argparse
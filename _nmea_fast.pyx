@@ -0,0 +1,285 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+_nmea_fast.pyx
+Optional compiled NMEA reader for gps_tracker (POSIX only).
+Reads the serial file descriptor directly and, without the GIL, splits lines,
+checks the XOR checksum and parses GGA/RMC fixes. Only the per-fix callback
+runs Python code. gps_tracker falls back to pure Python when this module is
+not built.
+
+Build in place (needs Cython and a C compiler):
+cythonize -i _nmea_fast.pyx
+"""
+
+import os
+
+from libc.errno cimport errno, EAGAIN, EINTR
+from libc.math cimport NAN
+from libc.stdlib cimport strtod
+from libc.string cimport memchr, memmove
+from posix.unistd cimport read
+
+cdef enum:
+    BUF_SIZE = 4096   # raw bytes kept between reads (NMEA lines are <= 82 chars)
+    MAX_FIELDS = 24
+    FIX_BATCH = 32    # fixes parsed per GIL release
+
+cdef struct Fix:
+    double lat
+    double lon
+    double alt      # NAN if missing (always for RMC)
+    double sod      # seconds of day, -1 if missing
+    int ddmmyy      # RMC date, -1 if missing (always for GGA)
+
+
+cdef inline int _hex(char c) noexcept nogil:
+    if 48 <= c <= 57:       # '0'..'9'
+        return c - 48
+    if 65 <= c <= 70:       # 'A'..'F'
+        return c - 55
+    if 97 <= c <= 102:      # 'a'..'f'
+        return c - 87
+    return -1
+
+
+cdef inline int _digits(const char* s, int n, long* out) noexcept nogil:
+    """Parses n decimal digits into out. Returns 0 on a non-digit."""
+    cdef long v = 0
+    cdef int i
+    for i in range(n):
+        if s[i] < 48 or s[i] > 57:
+            return 0
+        v = v * 10 + (s[i] - 48)
+    out[0] = v
+    return 1
+
+
+cdef int _fraction(const char* s, int n, double* out) noexcept nogil:
+    """Parses the digits after a '.' (s points past the dot) into out."""
+    cdef double v = 0.0
+    cdef double scale = 1.0
+    cdef int i
+    for i in range(n):
+        if s[i] < 48 or s[i] > 57:
+            return 0
+        v = v * 10.0 + (s[i] - 48)
+        scale *= 10.0
+    out[0] = v / scale
+    return 1
+
+
+cdef int _parse_coord(const char* s, int n, const char* d, int dn, double* out) noexcept nogil:
+    """ddmm.mmmm / dddmm.mmmm + hemisphere -> signed decimal degrees."""
+    cdef int head = 0
+    cdef long deg, minutes
+    cdef double frac = 0.0
+    cdef double sign
+    if dn != 1:
+        return 0
+    if d[0] == 78 or d[0] == 69:        # 'N', 'E'
+        sign = 1.0
+    elif d[0] == 83 or d[0] == 87:      # 'S', 'W'
+        sign = -1.0
+    else:
+        return 0
+    while head < n and s[head] != 46:  # '.'
+        head += 1
+    if head < 3:
+        return 0
+    if not _digits(s, head - 2, &deg) or not _digits(s + head - 2, 2, &minutes):
+        return 0
+    if head < n and not _fraction(s + head + 1, n - head - 1, &frac):
+        return 0
+    out[0] = sign * (deg + (minutes + frac) / 60.0)
+    return 1
+
+
+cdef int _parse_time(const char* s, int n, double* out) noexcept nogil:
+    """hhmmss(.sss) -> seconds of day."""
+    cdef long hh, mm, ss
+    cdef double frac = 0.0
+    if n < 6:
+        return 0
+    if not (_digits(s, 2, &hh) and _digits(s + 2, 2, &mm) and _digits(s + 4, 2, &ss)):
+        return 0
+    if hh > 23 or mm > 59 or ss > 59:
+        return 0
+    if n > 6:
+        if s[6] != 46 or not _fraction(s + 7, n - 7, &frac):
+            return 0
+    out[0] = hh * 3600 + mm * 60 + ss + frac
+    return 1
+
+
+cdef int _parse_alt(const char* s, int n, double* out) noexcept nogil:
+    """Altitude field -> meters; accepts what float() does (sign, exponent...)."""
+    cdef char* stop
+    cdef double v
+    cdef int i
+    for i in range(n):
+        if s[i] == 120 or s[i] == 88:   # 'x'/'X': strtod takes hex floats, float() does not
+            return 0
+    v = strtod(s, &stop)                # stops at the ',' / '*' ending the field
+    if stop != s + n:
+        return 0
+    out[0] = v
+    return 1
+
+
+cdef int _parse_line(const char* p, int n, Fix* fix) noexcept nogil:
+    """Parses one line. Returns 1 and fills fix for a valid GGA/RMC fix, 0 otherwise."""
+    cdef int i, end, nf, is_gga
+    cdef int start[MAX_FIELDS]
+    cdef int length[MAX_FIELDS]
+    cdef unsigned char x = 0
+    cdef long date
+    cdef int hi, lo
+
+    while n and (p[n - 1] == 13 or p[n - 1] == 32):    # trailing '\r' / ' '
+        n -= 1
+    while n and p[0] == 32:
+        p += 1
+        n -= 1
+    # "$xxGGA," / "$xxRMC,"
+    if n < 7 or p[6] != 44:
+        return 0
+    if p[3] == 71 and p[4] == 71 and p[5] == 65:        # GGA
+        is_gga = 1
+    elif p[3] == 82 and p[4] == 77 and p[5] == 67:      # RMC
+        is_gga = 0
+    else:
+        return 0
+
+    # checksum over the bytes between '$' and '*' (optional, like pynmea2)
+    end = 1
+    while end < n and p[end] != 42:    # '*'
+        x ^= <unsigned char>p[end]
+        end += 1
+    if end < n:
+        if end + 2 >= n:
+            return 0
+        hi = _hex(p[end + 1])
+        lo = _hex(p[end + 2])
+        if hi < 0 or lo < 0 or (hi << 4 | lo) != x:
+            return 0
+
+    # split fields in [0, end)
+    nf = 0
+    start[0] = 0
+    for i in range(end + 1):
+        if i == end or p[i] == 44:     # ','
+            length[nf] = i - start[nf]
+            nf += 1
+            if nf == MAX_FIELDS:
+                break
+            start[nf] = i + 1
+    # short sentence: missing trailing fields read as empty (like pynmea2)
+    if nf < (6 if is_gga else 7):
+        return 0
+    for i in range(nf, 10):
+        start[i] = end
+        length[i] = 0
+
+    fix.sod = -1.0
+    fix.ddmmyy = -1
+    fix.alt = NAN
+    if is_gga:
+        # 1 time, 2/3 lat, 4/5 lon, 9 alt
+        if length[2] == 0 or length[4] == 0:
+            return 0
+        if not _parse_coord(p + start[2], length[2], p + start[3], length[3], &fix.lat):
+            return 0
+        if not _parse_coord(p + start[4], length[4], p + start[5], length[5], &fix.lon):
+            return 0
+        if length[9] and not _parse_alt(p + start[9], length[9], &fix.alt):
+            fix.alt = NAN  # unparseable: publish without altitude
+    else:
+        # 1 time, 2 status, 3/4 lat, 5/6 lon, 9 date
+        if length[2] != 1 or p[start[2]] != 65:         # 'A' = active (valid)
+            return 0
+        if length[3] == 0 or length[5] == 0:
+            return 0
+        if not _parse_coord(p + start[3], length[3], p + start[4], length[4], &fix.lat):
+            return 0
+        if not _parse_coord(p + start[5], length[5], p + start[6], length[6], &fix.lon):
+            return 0
+        if length[9] == 6 and _digits(p + start[9], 6, &date):
+            fix.ddmmyy = <int>date  # checked as a calendar date on the Python side
+    if length[1] and not _parse_time(p + start[1], length[1], &fix.sod):
+        fix.sod = -1.0  # invalid time: publish without timestamp
+    return 1
+
+
+cdef class NMEAReader:
+    """
+    NMEAReader(fd, callback): reads NMEA from a non-blocking fd (as opened by pyserial
+    on POSIX) and calls callback(lat, lon, alt, sod, ddmmyy) for each GGA/RMC fix.
+    alt is NaN when missing, sod (seconds of day) -1 when missing, ddmmyy -1 for GGA.
+    """
+
+    cdef int fd
+    cdef object callback
+    cdef char buf[BUF_SIZE]
+    cdef Py_ssize_t used
+
+    def __cinit__(self, int fd, callback):
+        self.fd = fd
+        self.callback = callback
+        self.used = 0
+
+    def read(self):
+        """
+        One read() of whatever the fd has, then parses every complete line.
+        Returns the number of fixes delivered (0 if nothing was available).
+        Call it only when select() reports the fd readable.
+        Raises OSError on read errors and on end of file (device unplugged).
+        """
+        cdef Py_ssize_t got
+        cdef Py_ssize_t start = 0
+        cdef Py_ssize_t nl_pos
+        cdef const char* nl
+        cdef int err = 0
+        cdef int nfix, i
+        cdef int delivered = 0
+        cdef Fix fixes[FIX_BATCH]
+
+        with nogil:
+            got = read(self.fd, self.buf + self.used, BUF_SIZE - self.used)
+            if got < 0:
+                err = errno
+        if got < 0:
+            if err == EAGAIN or err == EINTR:  # nothing to read on the non-blocking fd
+                return 0
+            raise OSError(err, os.strerror(err))
+        if got == 0:
+            # a tty set up by pyserial (VMIN=0) also returns 0 when empty, so callers
+            # must only read() once select() reports the fd readable: then 0 means hangup
+            raise OSError('device reports readiness to read but returned no data '
+                          '(device disconnected or multiple access on port?)')
+        self.used += got
+
+        while True:
+            nfix = 0
+            with nogil:
+                while nfix < FIX_BATCH:
+                    nl = <const char*>memchr(self.buf + start, 10, self.used - start)
+                    if nl == NULL:
+                        break
+                    nl_pos = nl - self.buf
+                    if _parse_line(self.buf + start, <int>(nl_pos - start), &fixes[nfix]):
+                        nfix += 1
+                    start = nl_pos + 1
+                # drop consumed lines first, so a raising callback never sees them twice
+                if start:
+                    memmove(self.buf, self.buf + start, self.used - start)
+                    self.used -= start
+                    start = 0
+            for i in range(nfix):
+                self.callback(fixes[i].lat, fixes[i].lon, fixes[i].alt, fixes[i].sod, fixes[i].ddmmyy)
+            delivered += nfix
+            if nfix < FIX_BATCH:
+                break
+
+        if self.used == BUF_SIZE:
+            self.used = 0  # full buffer without a newline: noise, not NMEA
+        return delivered